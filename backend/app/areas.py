@@ -0,0 +1,233 @@
+from __future__ import annotations
+
+import difflib
+import math
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.lazy import lazy_import
+from app.risk_lens import REF_LAT, grid_id
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+# Named-area index built from the historical Neighborhood/District columns.
+#
+# Each area owns a set of small grid tiles (AREA_TILE_KM, anchored at REF_LAT):
+# every tile goes to the area with the most historical incidents in it, and
+# empty tiles next to owned ones are filled from their neighbours so areas
+# don't have holes where history is thin. Membership of a live point is then
+# a set lookup on its tile id, and a query resolves to an area by looking its
+# word n-grams up in a name dict (with a fuzzy fallback for typos).
+#
+# The fuzzy fallback only looks at the distinctive words of a name (what's
+# left after GENERIC_WORDS like "district", "park", "the"), so a query that
+# just says "my district" or "the park" can't drift onto some named area.
+# District aliases have no distinctive word long enough and are exact-only.
+
+AREA_TILE_KM = 0.2
+FILL_PASSES = 2
+MAX_NGRAM = 5
+FUZZY_CUTOFF = 0.85
+FUZZY_MIN_CHARS = 5
+
+ORDINALS = {1: "1st", 2: "2nd", 3: "3rd", 4: "4th", 5: "5th", 6: "6th", 7: "7th", 8: "8th", 9: "9th"}
+NUMBER_WORDS = {1: "one", 2: "two", 3: "three", 4: "four", 5: "five", 6: "six", 7: "seven", 8: "eight", 9: "nine"}
+ORDINAL_WORDS = {1: "first", 2: "second", 3: "third", 4: "fourth", 5: "fifth", 6: "sixth", 7: "seventh", 8: "eighth", 9: "ninth"}
+GENERIC_WORDS = {
+    "the", "district", "st", "park", "place", "square", "heights", "hill", "hills",
+    "north", "south", "east", "west", "near", "end", "old", "city", "area",
+}
+IGNORED_NAMES = {"na (outside city)", "unknown", "nan", ""}
+
+
+def normalize_name(s: str) -> str:
+    t = (s or "").lower()
+    t = re.sub(r"[^a-z0-9]+", " ", t)
+    t = re.sub(r"\bsaint\b", "st", t)
+    return re.sub(r"\s+", " ", t).strip()
+
+
+def _aliases(kind: str, name: str) -> List[str]:
+    n = normalize_name(name)
+    if kind == "district":
+        try:
+            num = int(float(name))
+        except ValueError:
+            return [n]
+        out = [f"district {num}", f"{ORDINALS.get(num, str(num))} district"]
+        if num in NUMBER_WORDS:
+            out.append(f"district {NUMBER_WORDS[num]}")
+        if num in ORDINAL_WORDS:
+            out.append(f"{ORDINAL_WORDS[num]} district")
+        return out
+    return [n]
+
+
+def _distinctive(name: str) -> List[str]:
+    return [w for w in name.split() if w not in GENERIC_WORDS]
+
+
+def _fuzzy_names(names: Iterable[str]) -> Dict[str, List[str]]:
+    """Aliases eligible for fuzzy matching -> their distinctive words."""
+    out = {}
+    for alias in names:
+        words = _distinctive(alias)
+        if len(" ".join(words)) >= FUZZY_MIN_CHARS:
+            out[alias] = words
+    return out
+
+
+def _tile_owners(keys: Iterable[Tuple[int, int]], owners: Iterable[str]) -> Dict[Tuple[int, int], str]:
+    tally: Dict[Tuple[int, int], Dict[str, int]] = {}
+    for tile, owner in zip(keys, owners):
+        t = tally.setdefault(tile, {})
+        t[owner] = t.get(owner, 0) + 1
+    owned = {tile: max(c.items(), key=lambda x: x[1])[0] for tile, c in tally.items()}
+
+    for _ in range(FILL_PASSES):
+        votes: Dict[Tuple[int, int], Dict[str, int]] = {}
+        for (gx, gy), owner in owned.items():
+            for dx in (-1, 0, 1):
+                for dy in (-1, 0, 1):
+                    nb = (gx + dx, gy + dy)
+                    if nb in owned:
+                        continue
+                    v = votes.setdefault(nb, {})
+                    v[owner] = v.get(owner, 0) + 1
+        for tile, v in votes.items():
+            owned[tile] = max(v.items(), key=lambda x: x[1])[0]
+    return owned
+
+
+def build_area_index(frames: Iterable["pd.DataFrame"]) -> Dict[str, Any]:
+    """
+    Build the area index from monthly frames (Neighborhood, District,
+    Latitude, Longitude columns).
+    """
+    parts = []
+    for df in frames:
+        cols = {c.lower(): c for c in df.columns}
+        if "latitude" not in cols or "longitude" not in cols:
+            continue
+        part = pd.DataFrame({
+            "lat": pd.to_numeric(df[cols["latitude"]], errors="coerce"),
+            "lng": pd.to_numeric(df[cols["longitude"]], errors="coerce"),
+            "neighborhood": df[cols["neighborhood"]] if "neighborhood" in cols else None,
+            "district": df[cols["district"]] if "district" in cols else None,
+        })
+        parts.append(part)
+
+    areas: Dict[str, Dict[str, Any]] = {}
+    names: Dict[str, str] = {}
+    if not parts:
+        return {"areas": areas, "names": names, "name_list": [], "fuzzy": {}}
+
+    pts = pd.concat(parts, ignore_index=True)
+    pts = pts[pts["lat"].notna() & pts["lng"].notna() & (pts["lat"] != 0) & (pts["lng"] != 0)]
+
+    dy = AREA_TILE_KM / 111.0
+    dx = AREA_TILE_KM / max(1e-6, 111.0 * math.cos(math.radians(REF_LAT)))
+    gx = np.floor(pts["lng"].to_numpy(dtype=float) / dx).astype(np.int64)
+    gy = np.floor(pts["lat"].to_numpy(dtype=float) / dy).astype(np.int64)
+    tiles = list(zip(gx.tolist(), gy.tolist()))
+
+    for kind in ["neighborhood", "district"]:
+        raw = pts[kind]
+        if raw.isna().all():
+            continue
+        labels = raw.astype(str).str.strip()
+        if kind == "district":
+            labels = labels.where(pd.to_numeric(raw, errors="coerce").fillna(0) > 0, "")
+        keep = ~labels.str.lower().isin(IGNORED_NAMES).to_numpy()
+
+        owned = _tile_owners(
+            (t for t, k in zip(tiles, keep) if k),
+            labels[keep].tolist(),
+        )
+        by_area: Dict[str, set] = {}
+        for tile, owner in owned.items():
+            by_area.setdefault(owner, set()).add(tile)
+
+        counts = labels[keep].value_counts()
+        for label, tile_set in by_area.items():
+            display = f"District {int(float(label))}" if kind == "district" else label
+            area_id = f"{kind}:{display}"
+            areas[area_id] = {
+                "id": area_id,
+                "kind": kind,
+                "name": display,
+                "tiles": frozenset(tile_set),
+                "incidents": int(counts.get(label, 0)),
+            }
+            for alias in _aliases(kind, label):
+                names.setdefault(alias, area_id)
+
+    name_list = sorted(names)
+    return {"areas": areas, "names": names, "name_list": name_list, "fuzzy": _fuzzy_names(name_list)}
+
+
+def resolve_area(index: Dict[str, Any], q: str) -> Optional[Dict[str, Any]]:
+    """
+    The named area a query refers to, as {"area", "matched", "match"}, or
+    None. Tries every word n-gram (longest first) against the name dict, then
+    falls back to fuzzy matching the same n-grams; a fuzzy hit must also
+    match every distinctive word of the area name.
+    """
+    if not index or not index["names"]:
+        return None
+    words = normalize_name(q).split()
+    grams = []
+    for n in range(min(MAX_NGRAM, len(words)), 0, -1):
+        for i in range(len(words) - n + 1):
+            grams.append(" ".join(words[i:i + n]))
+
+    for g in grams:
+        area_id = index["names"].get(g)
+        if area_id:
+            return {"area": index["areas"][area_id], "matched": g, "match": "exact"}
+
+    fuzzy = index.get("fuzzy") or {}
+    for g in grams:
+        g_words = _distinctive(g)
+        if len(" ".join(g_words)) < FUZZY_MIN_CHARS:
+            continue
+        for alias in difflib.get_close_matches(g, list(fuzzy), n=3, cutoff=FUZZY_CUTOFF):
+            if all(difflib.get_close_matches(w, g_words, n=1, cutoff=FUZZY_CUTOFF) for w in fuzzy[alias]):
+                area_id = index["names"][alias]
+                return {"area": index["areas"][area_id], "matched": alias, "match": "fuzzy"}
+    return None
+
+
+def area_tile(p: Dict[str, Any]) -> Optional[Tuple[int, int]]:
+    lat = p.get("lat")
+    lng = p.get("lng")
+    if not isinstance(lat, (int, float)) or not isinstance(lng, (int, float)):
+        return None
+    return grid_id(lat, lng, AREA_TILE_KM, REF_LAT)
+
+
+def index_points(points: List[Dict[str, Any]]) -> Dict[Tuple[int, int], List[Dict[str, Any]]]:
+    """Group points by area tile so several areas can be cut from one pass."""
+    out: Dict[Tuple[int, int], List[Dict[str, Any]]] = {}
+    for p in points:
+        t = area_tile(p)
+        if t is not None:
+            out.setdefault(t, []).append(p)
+    return out
+
+
+def points_in_area(point_index: Dict[Tuple[int, int], List[Dict[str, Any]]], area: Dict[str, Any]) -> List[Dict[str, Any]]:
+    tiles = area["tiles"]
+    if len(tiles) < len(point_index):
+        return [p for t in tiles for p in point_index.get(t, ())]
+    return [p for t, ps in point_index.items() if t in tiles for p in ps]
+
+
+def area_summary(index: Dict[str, Any]) -> List[Dict[str, Any]]:
+    return sorted(
+        ({"id": a["id"], "kind": a["kind"], "name": a["name"], "tiles": len(a["tiles"]), "incidents": a["incidents"]}
+         for a in index["areas"].values()),
+        key=lambda x: (x["kind"], x["name"]),
+    )
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+
+# Static, versioned copies of historical responses written by precompute.py.
+#
+# Layout under the artifact root:
+#   LATEST                      -> name of the current version directory
+#   <version>/manifest.json     -> inputs (month files) + list of artifacts
+#   <version>/<kind>/<key>.json -> one response body
+#
+# The version is a hash of the month files' contents, so re-running the build
+# on unchanged data is a no-op. At request time an artifact is only served if
+# the month files on disk still match the manifest: same names and sizes, and
+# for any file whose mtime differs from the build, the same sha1 (hashed once
+# per (path, size, mtime) and cached). Otherwise the API falls back to live
+# computation.
+
+SCHEMA_VERSION = 2
+
+_lock = threading.Lock()
+_state: Dict[str, Any] = {"root": None, "latest_mtime": None, "manifest": None, "payloads": {}}
+_sha1_cache: Dict[Tuple[str, int, int], str] = {}
+
+
+def default_root() -> str:
+    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.getenv("ARCHALERT_ARTIFACT_DIR", os.path.join(base, "data", "artifacts"))
+
+
+def _sha1_file(path: str) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _file_sha1(path: str, st: os.stat_result) -> str:
+    key = (path, st.st_size, st.st_mtime_ns)
+    digest = _sha1_cache.get(key)
+    if digest is None:
+        digest = _sha1_file(path)
+        _sha1_cache[key] = digest
+    return digest
+
+
+def describe_inputs(paths: List[str]) -> List[Dict[str, Any]]:
+    out = []
+    for p in sorted(paths):
+        st = os.stat(p)
+        out.append({"name": os.path.basename(p), "size": st.st_size, "mtime_ns": st.st_mtime_ns, "sha1": _file_sha1(p, st)})
+    return out
+
+
+def version_for(inputs: List[Dict[str, Any]]) -> str:
+    # Content only: touching a file without changing it keeps the version
+    inputs = [{k: v for k, v in x.items() if k != "mtime_ns"} for x in inputs]
+    blob = json.dumps({"schema": SCHEMA_VERSION, "inputs": inputs}, sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:12]
+
+
+def _write_json(path: str, obj: Any) -> None:
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(obj, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def write_artifacts(
+    inputs: List[Dict[str, Any]],
+    payloads: Dict[Tuple[str, str], Any],
+    root: Optional[str] = None,
+) -> str:
+    """
+    Write one version directory and point LATEST at it. Returns the version.
+    """
+    root = root or default_root()
+    version = version_for(inputs)
+    vdir = os.path.join(root, version)
+
+    for (kind, key), body in payloads.items():
+        _write_json(os.path.join(vdir, kind, f"{key}.json"), body)
+
+    manifest = {
+        "schema": SCHEMA_VERSION,
+        "version": version,
+        "built_at": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z"),
+        "inputs": inputs,
+        "artifacts": sorted(f"{kind}/{key}" for kind, key in payloads),
+    }
+    _write_json(os.path.join(vdir, "manifest.json"), manifest)
+
+    tmp = os.path.join(root, "LATEST.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(version)
+    os.replace(tmp, os.path.join(root, "LATEST"))
+    return version
+
+
+def _current_manifest(root: str) -> Optional[Dict[str, Any]]:
+    latest = os.path.join(root, "LATEST")
+    try:
+        mtime = os.path.getmtime(latest)
+    except OSError:
+        return None
+
+    if _state["root"] == root and _state["latest_mtime"] == mtime:
+        return _state["manifest"]
+
+    manifest = None
+    try:
+        with open(latest, encoding="utf-8") as f:
+            version = f.read().strip()
+        with open(os.path.join(root, version, "manifest.json"), encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest.get("schema") != SCHEMA_VERSION:
+            manifest = None
+    except (OSError, ValueError):
+        manifest = None
+
+    _state.update({"root": root, "latest_mtime": mtime, "manifest": manifest, "payloads": {}})
+    return manifest
+
+
+def _inputs_match(manifest: Dict[str, Any], paths: List[str]) -> bool:
+    built = {x["name"]: x for x in manifest.get("inputs", [])}
+    if len(built) != len(paths):
+        return False
+    for p in paths:
+        x = built.get(os.path.basename(p))
+        st = os.stat(p)
+        if x is None or x["size"] != st.st_size:
+            return False
+        # Unchanged mtime -> trust the build; otherwise (edited, copied,
+        # or an older manifest without mtimes) compare contents.
+        if x.get("mtime_ns") != st.st_mtime_ns and x.get("sha1") != _file_sha1(p, st):
+            return False
+    return True
+
+
+def load_artifact(kind: str, key: str, input_paths: List[str], root: Optional[str] = None) -> Optional[Any]:
+    """
+    The stored response for (kind, key), or None if there is no current
+    build, it doesn't cover this key, or the month files changed since.
+    """
+    root = root or default_root()
+    with _lock:
+        manifest = _current_manifest(root)
+        if manifest is None or not _inputs_match(manifest, input_paths):
+            return None
+
+        name = f"{kind}/{key}"
+        if name in _state["payloads"]:
+            return _state["payloads"][name]
+        if name not in manifest.get("artifacts", []):
+            return None
+
+        try:
+            with open(os.path.join(root, manifest["version"], kind, f"{key}.json"), encoding="utf-8") as f:
+                body = json.load(f)
+        except (OSError, ValueError):
+            return None
+        _state["payloads"][name] = body
+        return body
@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import calendar
+import math
+from typing import Any, Dict, Hashable, Tuple
+
+from app.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+from app.risk_lens import REF_LAT
+
+
+HOURS_PER_WEEK = 168
+
+
+def new_baseline(tile_km: float, lat0: float = REF_LAT) -> Dict[str, Any]:
+    """
+    Baseline of historical counts per (tile, hour-of-week).
+
+    "months" keeps each ingested month's own contribution so a month can be
+    added (or replaced when its file changes) without touching the others.
+    "prefix" holds per-tile cumulative sums over the 168 hours of the week,
+    which makes any window lookup a constant number of array reads.
+    """
+    return {
+        "tile_km": float(tile_km),
+        "lat0": float(lat0),
+        "months": {},
+        "weeks": 0.0,
+        "counts": {},
+        "prefix": {},
+    }
+
+
+def _month_weeks(month_key: str) -> float:
+    year, month = (int(x) for x in month_key.split("-"))
+    return calendar.monthrange(year, month)[1] / 7.0
+
+
+def _month_counts(table: Dict[str, Any], month_key: str, df: pd.DataFrame) -> Dict[Tuple[int, int, int], int]:
+    cols = {c.lower(): c for c in df.columns}
+    date_col = cols.get("incidentdate")
+    time_col = cols.get("occurredfromtime")
+    lat_col = cols.get("latitude")
+    lng_col = cols.get("longitude")
+    if not date_col or not lat_col or not lng_col:
+        return {}
+
+    dt = pd.to_datetime(df[date_col], errors="coerce", format="mixed")
+    if time_col:
+        hours = pd.to_datetime(df[time_col], errors="coerce", format="%H:%M:%S").dt.hour
+    else:
+        hours = dt.dt.hour
+    lat = pd.to_numeric(df[lat_col], errors="coerce")
+    lng = pd.to_numeric(df[lng_col], errors="coerce")
+
+    # Only count incidents that occurred in this month: supplemented older
+    # incidents are carried in later files and would skew the hour-of-week mix.
+    in_month = dt.dt.strftime("%Y-%m") == month_key
+    ok = in_month & hours.notna() & lat.notna() & lng.notna() & (lat != 0) & (lng != 0)
+    if not ok.any():
+        return {}
+
+    dy = table["tile_km"] / 111.0
+    dx = table["tile_km"] / max(1e-6, 111.0 * math.cos(math.radians(table["lat0"])))
+    gx = np.floor(lng[ok].to_numpy(dtype=float) / dx).astype(np.int64)
+    gy = np.floor(lat[ok].to_numpy(dtype=float) / dy).astype(np.int64)
+    how = (dt[ok].dt.weekday.to_numpy() * 24 + hours[ok].to_numpy()).astype(np.int64)
+
+    g = pd.DataFrame({"gx": gx, "gy": gy, "how": how}).groupby(["gx", "gy", "how"]).size()
+    return {(int(a), int(b), int(h)): int(n) for (a, b, h), n in g.items()}
+
+
+def _apply(table: Dict[str, Any], counts: Dict[Tuple[int, int, int], int], sign: int) -> set:
+    touched = set()
+    for (gx, gy, how), n in counts.items():
+        row = table["counts"].get((gx, gy))
+        if row is None:
+            row = [0] * HOURS_PER_WEEK
+            table["counts"][(gx, gy)] = row
+        row[how] += sign * n
+        touched.add((gx, gy))
+    return touched
+
+
+def add_month(table: Dict[str, Any], month_key: str, df: pd.DataFrame, signature: Hashable = None) -> bool:
+    """
+    Fold one month file into the baseline. Re-adding a month with the same
+    signature (e.g. file mtime) is a no-op; a new signature replaces the old
+    contribution. Returns True if the table changed.
+    """
+    prev = table["months"].get(month_key)
+    if prev is not None and prev["signature"] == signature:
+        return False
+
+    touched = set()
+    if prev is not None:
+        touched |= _apply(table, prev["counts"], -1)
+        table["weeks"] -= prev["weeks"]
+
+    counts = _month_counts(table, month_key, df)
+    weeks = _month_weeks(month_key)
+    touched |= _apply(table, counts, 1)
+    table["weeks"] += weeks
+    table["months"][month_key] = {"signature": signature, "weeks": weeks, "counts": counts}
+
+    for tile in touched:
+        row = table["counts"][tile]
+        if not any(row):
+            del table["counts"][tile]
+            table["prefix"].pop(tile, None)
+            continue
+        table["prefix"][tile] = np.concatenate(([0], np.cumsum(row))).tolist()
+    return True
+
+
+def hour_of_week(ts) -> int:
+    return int(ts.weekday()) * 24 + int(ts.hour)
+
+
+def expected_count(table: Dict[str, Any], end_how: int, hours: int, tile: Tuple[int, int]) -> float:
+    """
+    Average historical count for `tile` over the `hours` ending at hour-of-week
+    `end_how` (inclusive).
+    """
+    prefix = table["prefix"].get(tile)
+    if prefix is None or table["weeks"] <= 0:
+        return 0.0
+
+    full_weeks, rest = divmod(int(hours), HOURS_PER_WEEK)
+    total = full_weeks * prefix[HOURS_PER_WEEK]
+    if rest:
+        start = (end_how + 1 - rest) % HOURS_PER_WEEK
+        stop = end_how + 1
+        if start < stop:
+            total += prefix[stop] - prefix[start]
+        else:
+            total += prefix[HOURS_PER_WEEK] - prefix[start] + prefix[stop]
+    return total / table["weeks"]
+
+
+def baseline_info(table: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "months": sorted(table["months"].keys()),
+        "weeks": round(float(table["weeks"]), 2),
+        "tiles": len(table["prefix"]),
+    }
@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import json
+import os
+import re
+import sys
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+# Offense / call-type classification shared by live tile scoring and the
+# historical stats/heat paths.
+#
+# Rules are keyword -> (category, weight), checked in order: the first rule
+# whose keyword appears anywhere in the normalized text wins. All keywords are
+# compiled into one regex, and results are memoized per distinct input string,
+# so classifying a column means classifying its few hundred distinct values.
+#
+# There are two compiled tables sharing the same engine:
+#   "live"       -> the live call-type weights (unchanged original table)
+#   "historical" -> the live rules followed by extra rules for historical
+#                   Offense wording (homicide, weapons, ...)
+# Keeping them apart means the historical keywords never change live weights
+# (e.g. "WEAPON VIOLATION" stays at the default weight for live calls).
+#
+# The rule tables can be replaced with a JSON file (ARCHALERT_OFFENSE_RULES):
+#   {"rules": [{"match": "shooting", "category": "shooting", "weight": 3.0}, ...],
+#    "historical_rules": [{"match": "homicide", "category": "homicide", "weight": 3.0}, ...],
+#    "default": {"category": "other", "weight": 1.0}}
+
+LIVE_RULES: List[Dict[str, Any]] = [
+    # live call types (original weight table, same order)
+    {"match": "shooting", "category": "shooting", "weight": 3.0},
+    {"match": "shots fired", "category": "shooting", "weight": 3.0},
+    {"match": "armed", "category": "armed", "weight": 2.6},
+    {"match": "robbery", "category": "robbery", "weight": 2.4},
+    {"match": "assault", "category": "assault", "weight": 2.2},
+    {"match": "burglary", "category": "burglary", "weight": 2.0},
+    {"match": "domestic", "category": "domestic", "weight": 1.8},
+    {"match": "auto", "category": "auto", "weight": 1.6},
+    {"match": "theft", "category": "theft", "weight": 1.4},
+    {"match": "disturbance", "category": "disturbance", "weight": 1.2},
+    {"match": "suspicious", "category": "suspicious", "weight": 1.1},
+]
+HISTORICAL_EXTRA_RULES: List[Dict[str, Any]] = [
+    # historical Offense wording (checked after the live rules)
+    {"match": "murder", "category": "homicide", "weight": 3.0},
+    {"match": "homicide", "category": "homicide", "weight": 3.0},
+    {"match": "discharging firearm", "category": "shooting", "weight": 3.0},
+    {"match": "shoot", "category": "shooting", "weight": 3.0},
+    {"match": "weapon", "category": "weapons", "weight": 2.0},
+    {"match": "firearm", "category": "weapons", "weight": 2.0},
+    {"match": "accident", "category": "traffic", "weight": 1.0},
+    {"match": "motor vehicle", "category": "auto", "weight": 1.6},
+    {"match": "stealing", "category": "theft", "weight": 1.4},
+    {"match": "larceny", "category": "theft", "weight": 1.4},
+]
+DEFAULT_CATEGORY = {"category": "other", "weight": 1.0}
+
+_lock = threading.Lock()
+_tables: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+def _normalize(s: str) -> str:
+    return re.sub(r"\s+", " ", (s or "").strip().lower())
+
+
+def compile_rules(rules: List[Dict[str, Any]], default: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    default = default or DEFAULT_CATEGORY
+    categories: List[str] = [sys.intern(str(default["category"]))]
+    code_of = {categories[0]: 0}
+    compiled = []
+    for r in rules:
+        cat = sys.intern(str(r["category"]))
+        if cat not in code_of:
+            code_of[cat] = len(categories)
+            categories.append(cat)
+        compiled.append((_normalize(r["match"]), code_of[cat], float(r["weight"])))
+
+    # Lookahead so every start position is tried (overlapping keywords can't
+    # hide each other); alternatives are in rule order, so the earliest rule
+    # wins at a given position and we take the lowest rule index overall.
+    pattern = None
+    if compiled:
+        alts = "|".join(f"(?P<r{i}>{re.escape(kw)})" for i, (kw, _, _) in enumerate(compiled))
+        pattern = re.compile(f"(?=(?:{alts}))")
+
+    return {
+        "rules": compiled,
+        "categories": categories,
+        "default_weight": float(default["weight"]),
+        "pattern": pattern,
+        "memo": {},
+    }
+
+
+def load_rules(path: Optional[str] = None) -> Dict[str, Dict[str, Any]]:
+    """Both compiled tables, {"live": ..., "historical": ...}."""
+    path = path or os.getenv("ARCHALERT_OFFENSE_RULES", "").strip()
+    if not path:
+        live, extra, default = LIVE_RULES, HISTORICAL_EXTRA_RULES, None
+    else:
+        with open(path, encoding="utf-8") as f:
+            cfg = json.load(f)
+        live, extra, default = cfg.get("rules", []), cfg.get("historical_rules", []), cfg.get("default")
+    return {
+        "live": compile_rules(live, default),
+        "historical": compile_rules(list(live) + list(extra), default),
+    }
+
+
+def rule_table(kind: str = "live") -> Dict[str, Any]:
+    global _tables
+    if _tables is None:
+        with _lock:
+            if _tables is None:
+                _tables = load_rules()
+    return _tables[kind]
+
+
+def classify(text: Any, table: Optional[Dict[str, Any]] = None) -> Tuple[int, float]:
+    """(category_code, weight) for one type/offense string. Memoized."""
+    table = table or rule_table()
+    key = "" if text is None else str(text)
+    hit = table["memo"].get(key)
+    if hit is not None:
+        return hit
+
+    result = (0, table["default_weight"])
+    if table["pattern"] is not None:
+        best = None
+        for m in table["pattern"].finditer(_normalize(key)):
+            i = int(m.lastgroup[1:])
+            if best is None or i < best:
+                best = i
+                if i == 0:
+                    break
+        if best is not None:
+            _, code, weight = table["rules"][best]
+            result = (code, weight)
+
+    table["memo"][key] = result
+    return result
+
+
+def category_name(code: int, table: Optional[Dict[str, Any]] = None) -> str:
+    return (table or rule_table())["categories"][code]
+
+
+def classify_series(values, table: Optional[Dict[str, Any]] = None):
+    """
+    Classify a column by its distinct values. Returns (codes, weights) as
+    numpy arrays aligned with `values`.
+    """
+    table = table or rule_table()
+    labels, uniques = pd.factorize(pd.Series(values).fillna("UNKNOWN").astype(str))
+    per_unique = [classify(u, table) for u in uniques]
+    u_codes = np.array([c for c, _ in per_unique], dtype=np.int16)
+    u_weights = np.array([w for _, w in per_unique], dtype=float)
+    return u_codes[labels], u_weights[labels]
+
+
+def keyword_weights(table: Optional[Dict[str, Any]] = None) -> Dict[str, float]:
+    table = table or rule_table()
+    out = {kw: w for kw, _, w in table["rules"]}
+    out["default"] = table["default_weight"]
+    return out
@@ -0,0 +1,127 @@
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Dict, Hashable, Iterable
+
+from app.lazy import lazy_import
+
+np = lazy_import("numpy")
+pd = lazy_import("pandas")
+
+
+# Cross-month de-duplication of incidents.
+#
+# Each monthly file is a snapshot that also carries older incidents that were
+# supplemented during that month, so the same IncidentNum can show up in
+# several files. The newest file holding an incident has its latest
+# supplement, so that month "wins" the incident and the same incident's rows
+# in older months are marked superseded. Rows within one file are kept as-is
+# (one incident can have several offense rows).
+#
+# Keys are IncidentNum encoded as int64 and the index is updated one month at
+# a time, so adding a file only touches that file and the months it overlaps.
+
+
+# Rows without an IncidentNum can't be matched across months and are always kept.
+MISSING_KEY = -(2**63)
+
+
+def _hash_key(s: str) -> int:
+    # Non-numeric ids map into the negative range so they can't collide
+    # with real (positive) incident numbers.
+    h = int.from_bytes(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest(), "big")
+    return -1 - (h & 0x7FFFFFFFFFFFFFFF)
+
+
+def encode_incident_nums(values: Iterable[Any]) -> np.ndarray:
+    s = pd.Series(values, dtype="object").fillna("").astype(str).str.strip()
+    num = pd.to_numeric(s, errors="coerce")
+    out = np.full(len(s), MISSING_KEY, dtype=np.int64)
+    ok = num.notna().to_numpy()
+    out[ok] = num[ok].astype(np.int64).to_numpy()
+    named = ~ok & (s != "").to_numpy()
+    if named.any():
+        out[named] = [_hash_key(v) for v in s[named]]
+    return out
+
+
+def new_incident_index() -> Dict[str, Any]:
+    return {"months": {}, "winner": {}}
+
+
+def _set_superseded(index: Dict[str, Any], month_key: str, keys: np.ndarray, superseded: bool) -> None:
+    m = index["months"][month_key]
+    hit = np.isin(m["keys"], keys)
+    if superseded:
+        m["superseded"] |= hit
+    else:
+        m["superseded"] &= ~hit
+
+
+def drop_month(index: Dict[str, Any], month_key: str) -> None:
+    """
+    Remove a month and hand its incidents back to the newest other month that
+    still has them.
+    """
+    m = index["months"].pop(month_key, None)
+    if m is None:
+        return
+
+    winner = index["winner"]
+    orphaned = [int(k) for k in np.unique(m["keys"]) if winner.get(int(k)) == month_key]
+    for k in orphaned:
+        del winner[k]
+    if not orphaned:
+        return
+
+    orphaned_arr = np.array(orphaned, dtype=np.int64)
+    for other in sorted(index["months"], reverse=True):
+        o = index["months"][other]
+        present = np.unique(o["keys"][np.isin(o["keys"], orphaned_arr)])
+        fresh = [int(k) for k in present if int(k) not in winner]
+        if fresh:
+            for k in fresh:
+                winner[k] = other
+            _set_superseded(index, other, np.array(fresh, dtype=np.int64), superseded=False)
+
+
+def index_month(index: Dict[str, Any], month_key: str, keys: np.ndarray, signature: Hashable = None) -> bool:
+    """
+    Add one month's incident keys (aligned with its rows). A month already
+    indexed with the same signature is left alone; a changed one is replaced.
+    Returns True if the index changed.
+    """
+    prev = index["months"].get(month_key)
+    if prev is not None and prev["signature"] == signature:
+        return False
+    if prev is not None:
+        drop_month(index, month_key)
+
+    keys = np.asarray(keys, dtype=np.int64)
+    winner = index["winner"]
+    lost_here = []
+    taken_from: Dict[str, list] = {}
+    for k in np.unique(keys).tolist():
+        if k == MISSING_KEY:
+            continue
+        w = winner.get(k)
+        if w is None or w < month_key:
+            winner[k] = month_key
+            if w is not None:
+                taken_from.setdefault(w, []).append(k)
+        else:
+            lost_here.append(k)
+
+    index["months"][month_key] = {
+        "signature": signature,
+        "keys": keys,
+        "superseded": np.isin(keys, np.array(lost_here, dtype=np.int64)),
+    }
+    for other, ks in taken_from.items():
+        _set_superseded(index, other, np.array(ks, dtype=np.int64), superseded=True)
+    return True
+
+
+def keep_mask(index: Dict[str, Any], month_key: str) -> np.ndarray:
+    """Row mask for a month: True where the row isn't superseded by a newer month."""
+    return ~index["months"][month_key]["superseded"]
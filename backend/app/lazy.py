@@ -0,0 +1,59 @@
+from __future__ import annotations
+
+import importlib
+import threading
+from types import ModuleType
+from typing import Any, Iterable, Optional
+
+
+# One lock for every deferred import. importlib.util.LazyLoader isn't safe
+# when several threads touch a module for the first time (pandas/numpy can be
+# seen half-initialized), so the real import always happens here, serialized.
+_import_lock = threading.RLock()
+
+
+class _LazyModule:
+    """Stand-in for a module that is imported (under the lock) on first use."""
+
+    def __init__(self, name: str) -> None:
+        self.__dict__["_name"] = name
+        self.__dict__["_module"] = None
+
+    def _load(self) -> ModuleType:
+        module = self.__dict__["_module"]
+        if module is None:
+            with _import_lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    module = importlib.import_module(self.__dict__["_name"])
+                    self.__dict__["_module"] = module
+        return module
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_module"] is not None else "not loaded"
+        return f"<lazy module {self.__dict__['_name']!r} ({state})>"
+
+
+_proxies: dict = {}
+
+
+def lazy_import(name: str) -> Any:
+    """
+    Import `name` on first attribute access instead of now. Keeps pandas,
+    numpy, bs4 and requests off the startup path.
+    """
+    with _import_lock:
+        proxy = _proxies.get(name)
+        if proxy is None:
+            proxy = _LazyModule(name)
+            _proxies[name] = proxy
+        return proxy
+
+
+def preload(names: Optional[Iterable[str]] = None) -> None:
+    """Do the deferred imports now (used by the warmup thread)."""
+    for name in names if names is not None else list(_proxies):
+        lazy_import(name)._load()
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import os
+import sqlite3
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+
+# Local append-only log of scraped live calls. Each call is keyed by its
+# event number (or time/location/type when the feed has none), so re-scraping
+# the same page only refreshes last_seen. "dt" is the call time as a naive
+# local "YYYY-MM-DD HH:MM:SS" string, which sorts correctly and is indexed.
+#
+# Retention: after each upsert, calls older than LIVE_RETENTION_DAYS (counted
+# back from the newest stored call, via the dt index) are deleted, as are
+# unparsed-time rows not seen for that long. 0 keeps everything.
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS live_calls (
+    call_key   TEXT PRIMARY KEY,
+    dt         TEXT,
+    time       TEXT,
+    event      TEXT,
+    location   TEXT,
+    type       TEXT,
+    source     TEXT,
+    first_seen TEXT,
+    last_seen  TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_live_calls_dt ON live_calls(dt);
+CREATE TABLE IF NOT EXISTS live_meta (
+    k TEXT PRIMARY KEY,
+    v TEXT
+);
+"""
+
+CALL_FIELDS = ["time", "event", "location", "type", "source"]
+LIVE_RETENTION_DAYS = float(os.getenv("ARCHALERT_LIVE_RETENTION_DAYS", "14"))
+
+_lock = threading.Lock()
+_conn: Optional[sqlite3.Connection] = None
+_conn_path: Optional[str] = None
+
+
+def default_db_path() -> str:
+    base = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    return os.getenv("ARCHALERT_LIVE_DB", os.path.join(base, "data", "live", "live_calls.sqlite3"))
+
+
+def _connect(path: Optional[str] = None) -> sqlite3.Connection:
+    global _conn, _conn_path
+    path = path or default_db_path()
+    if _conn is not None and _conn_path == path:
+        return _conn
+
+    if path != ":memory:":
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    _conn, _conn_path = conn, path
+    return conn
+
+
+def call_key(call: Dict[str, Any]) -> str:
+    event = str(call.get("event") or "").strip()
+    if event:
+        return event
+    return "|".join(str(call.get(f) or "").strip() for f in ["time", "location", "type"])
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def _prune(conn: sqlite3.Connection) -> int:
+    if LIVE_RETENTION_DAYS <= 0:
+        return 0
+    row = conn.execute("SELECT MAX(dt) AS max_dt FROM live_calls").fetchone()
+    removed = 0
+    if row and row["max_dt"] is not None:
+        removed += conn.execute(
+            "DELETE FROM live_calls WHERE dt < datetime(?, ?)",
+            (row["max_dt"], f"-{LIVE_RETENTION_DAYS} days"),
+        ).rowcount
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=LIVE_RETENTION_DAYS)).isoformat().replace("+00:00", "Z")
+    removed += conn.execute(
+        "DELETE FROM live_calls WHERE dt IS NULL AND last_seen < ?", (cutoff,)
+    ).rowcount
+    return removed
+
+
+def append_calls(rows: Iterable[Tuple[Dict[str, Any], Optional[str]]], path: Optional[str] = None) -> int:
+    """
+    Upsert scraped calls. `rows` are (call, dt) pairs where dt is the parsed
+    local time as "YYYY-MM-DD HH:MM:SS" (or None if the time didn't parse).
+    Rows past the retention window are pruned in the same transaction.
+    Returns the number of rows written.
+    """
+    now = _now_iso()
+    params = []
+    for call, dt in rows:
+        params.append(
+            (call_key(call), dt, *[str(call.get(f) or "") for f in CALL_FIELDS], now, now)
+        )
+    if not params:
+        return 0
+
+    with _lock:
+        conn = _connect(path)
+        with conn:
+            conn.executemany(
+                """
+                INSERT INTO live_calls (call_key, dt, time, event, location, type, source, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT(call_key) DO UPDATE SET
+                    dt = COALESCE(excluded.dt, live_calls.dt),
+                    time = excluded.time,
+                    location = excluded.location,
+                    type = excluded.type,
+                    source = excluded.source,
+                    last_seen = excluded.last_seen
+                """,
+                params,
+            )
+            conn.execute(
+                "INSERT INTO live_meta (k, v) VALUES ('last_updated', ?) "
+                "ON CONFLICT(k) DO UPDATE SET v = excluded.v",
+                (now,),
+            )
+            _prune(conn)
+    return len(params)
+
+
+def last_updated(path: Optional[str] = None) -> Optional[str]:
+    with _lock:
+        row = _connect(path).execute("SELECT v FROM live_meta WHERE k = 'last_updated'").fetchone()
+    return row["v"] if row else None
+
+
+def _rows(cur: sqlite3.Cursor) -> List[Dict[str, Any]]:
+    return [dict(r) for r in cur.fetchall()]
+
+
+def latest_calls(limit: int = 500, path: Optional[str] = None) -> List[Dict[str, Any]]:
+    with _lock:
+        cur = _connect(path).execute(
+            f"SELECT dt, {', '.join(CALL_FIELDS)} FROM live_calls "
+            "WHERE dt IS NOT NULL ORDER BY dt DESC LIMIT ?",
+            (int(limit),),
+        )
+        return _rows(cur)
+
+
+def window_calls(since_hours: int, path: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Calls in the `since_hours` ending at the newest stored call, oldest first.
+    Both lookups are served from the dt index.
+    """
+    with _lock:
+        conn = _connect(path)
+        row = conn.execute("SELECT MAX(dt) AS max_dt FROM live_calls").fetchone()
+        if not row or row["max_dt"] is None:
+            return []
+        cur = conn.execute(
+            f"SELECT dt, {', '.join(CALL_FIELDS)} FROM live_calls "
+            "WHERE dt >= datetime(?, ?) ORDER BY dt",
+            (row["max_dt"], f"-{int(since_hours)} hours"),
+        )
+        return _rows(cur)
@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from fastapi.concurrency import run_in_threadpool
+
+from app.live_store import CALL_FIELDS, call_key
+
+
+# Server-Sent Events fan-out for the live feed.
+#
+# One producer task scrapes the feed every LIVE_REFRESH_SECONDS while at least
+# one client is connected, diffs the page against the previous snapshot, and
+# pushes only new/changed calls (plus summary counters) to every subscriber.
+# Each subscriber has a bounded queue; a client that falls behind has its
+# queue cleared and gets a full "snapshot" event instead, so a slow client
+# never blocks the producer or grows memory.
+
+LIVE_REFRESH_SECONDS = float(os.getenv("LIVE_REFRESH_SECONDS", "30"))
+SUBSCRIBER_QUEUE_SIZE = int(os.getenv("LIVE_STREAM_QUEUE_SIZE", "16"))
+KEEPALIVE_SECONDS = 15.0
+
+hub: Dict[str, Any] = {
+    "subscribers": set(),
+    "task": None,
+    "snapshot": {},
+    "version": 0,
+    "last_updated": None,
+    "last_error": None,
+}
+
+
+def _now_iso() -> str:
+    return datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def summarize(calls: List[Dict[str, Any]], top_n: int = 10) -> Dict[str, Any]:
+    counts: Dict[str, int] = {}
+    for c in calls:
+        t = str(c.get("type") or "UNKNOWN")
+        counts[t] = counts.get(t, 0) + 1
+    top = sorted(counts.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    return {"total": len(calls), "top_types": [[t, n] for t, n in top]}
+
+
+def _snapshot_event() -> Dict[str, Any]:
+    calls = list(hub["snapshot"].values())
+    return {
+        "event": "snapshot",
+        "version": hub["version"],
+        "last_updated": hub["last_updated"],
+        "calls": calls,
+        "summary": summarize(calls),
+    }
+
+
+def _publish(event: Dict[str, Any]) -> None:
+    for q in list(hub["subscribers"]):
+        try:
+            q.put_nowait(event)
+        except asyncio.QueueFull:
+            # Slow client: drop its backlog and let it resync from a snapshot
+            while not q.empty():
+                q.get_nowait()
+            q.put_nowait(_snapshot_event())
+
+
+def apply_calls(calls: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Replace the snapshot with a freshly scraped page. Returns the "update"
+    event (changed calls, removed keys, summary) or None if nothing changed.
+    """
+    fresh = {call_key(c): {f: c.get(f, "") for f in CALL_FIELDS} for c in calls}
+    old = hub["snapshot"]
+    changed = [c for k, c in fresh.items() if old.get(k) != c]
+    removed = [k for k in old if k not in fresh]
+
+    hub["snapshot"] = fresh
+    hub["last_updated"] = _now_iso()
+    if not changed and not removed:
+        return None
+
+    hub["version"] += 1
+    return {
+        "event": "update",
+        "version": hub["version"],
+        "last_updated": hub["last_updated"],
+        "calls": changed,
+        "removed": removed,
+        "summary": summarize(list(fresh.values())),
+    }
+
+
+async def _produce(fetch: Callable[[], List[Dict[str, Any]]]) -> None:
+    while hub["subscribers"]:
+        try:
+            calls = await run_in_threadpool(fetch)
+            hub["last_error"] = None
+            event = apply_calls(calls)
+            if event is not None:
+                _publish(event)
+        except Exception as e:
+            hub["last_error"] = f"{type(e).__name__}: {e}"
+        await asyncio.sleep(LIVE_REFRESH_SECONDS)
+    hub["task"] = None
+
+
+def subscribe(fetch: Callable[[], List[Dict[str, Any]]]) -> asyncio.Queue:
+    """
+    Register a client and make sure the producer is running. The queue starts
+    with the current snapshot so the client can render immediately.
+    """
+    q: asyncio.Queue = asyncio.Queue(maxsize=max(2, SUBSCRIBER_QUEUE_SIZE))
+    if hub["snapshot"]:
+        q.put_nowait(_snapshot_event())
+    hub["subscribers"].add(q)
+
+    task = hub["task"]
+    if task is None or task.done():
+        hub["task"] = asyncio.create_task(_produce(fetch))
+    return q
+
+
+def unsubscribe(q: asyncio.Queue) -> None:
+    hub["subscribers"].discard(q)
+
+
+def format_sse(event: Dict[str, Any]) -> str:
+    body = {k: v for k, v in event.items() if k != "event"}
+    return f"event: {event['event']}\nid: {event['version']}\ndata: {json.dumps(body)}\n\n"
+
+
+async def sse_events(fetch: Callable[[], List[Dict[str, Any]]], is_disconnected: Callable[[], Any]):
+    """
+    One client's event stream. Subscribes on first iteration, so a response
+    body that is never streamed (client gone before it starts) never
+    registers a queue or keeps the producer alive.
+    """
+    q = None
+    try:
+        q = subscribe(fetch)
+        while True:
+            if await is_disconnected():
+                break
+            try:
+                event = await asyncio.wait_for(q.get(), timeout=KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keepalive\n\n"
+                continue
+            yield format_sse(event)
+    finally:
+        if q is not None:
+            unsubscribe(q)
@@ -3,7 +3,9 @@ from __future__ import annotations
 import math
 import os
 import re
-from typing import Any, Dict, List, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.classify import category_name, classify, keyword_weights
 
 try:
     import httpx
@@ -13,6 +15,15 @@ except Exception:
 
 LLM_LAST_ERROR = ""
 
+# Reference latitude for St. Louis. Tiles scored against the historical
+# baseline use this instead of the mean of the live points so tile ids stay
+# stable between requests.
+REF_LAT = 38.627
+
+# Floor for the expected count when computing a z-score, so tiles with no
+# history don't produce infinite scores for a single call.
+MIN_EXPECTED = 0.25
+
 
 def _normalize_text(s: str) -> str:
     return re.sub(r"\s+", " ", (s or "").strip().lower())
@@ -66,29 +77,11 @@ def in_bbox(p: Dict[str, Any], b: Tuple[float, float, float, float]) -> bool:
 
 
 def type_weights() -> Dict[str, float]:
-    return {
-        "shooting": 3.0,
-        "shots fired": 3.0,
-        "armed": 2.6,
-        "robbery": 2.4,
-        "assault": 2.2,
-        "burglary": 2.0,
-        "domestic": 1.8,
-        "auto": 1.6,
-        "theft": 1.4,
-        "disturbance": 1.2,
-        "suspicious": 1.1,
-        "default": 1.0,
-    }
+    return keyword_weights()
 
 
 def weight_for_type(t: str) -> float:
-    s = _normalize_text(t)
-    w = type_weights()
-    for k, v in w.items():
-        if k != "default" and k in s:
-            return v
-    return w["default"]
+    return classify(t)[1]
 
 
 def grid_id(lat: float, lng: float, tile_km: float, lat0: float) -> Tuple[int, int]:
@@ -111,12 +104,37 @@ def grid_bounds(gx: int, gy: int, tile_km: float, lat0: float) -> Tuple[Tuple[fl
     return ((min_lat, min_lng), (min_lat + dy, min_lng + dx))
 
 
-def score_tiles(points: List[Dict[str, Any]], tile_km: float = 0.45, max_tiles: int = 14) -> Dict[str, Any]:
+def anomaly(observed: int, expected: float) -> Tuple[float, float]:
+    """
+    (ratio, z) of observed vs expected counts. The ratio is smoothed so empty
+    baselines don't divide by zero; z uses a Poisson approximation.
+    """
+    ratio = (observed + 0.5) / (expected + 0.5)
+    z = (observed - expected) / math.sqrt(max(expected, MIN_EXPECTED))
+    return ratio, z
+
+
+def score_tiles(
+    points: List[Dict[str, Any]],
+    tile_km: float = 0.45,
+    max_tiles: int = 14,
+    lat0: Optional[float] = None,
+    expected: Optional[Callable[[Tuple[int, int]], float]] = None,
+    rank_by: str = "score",
+) -> Dict[str, Any]:
+    """
+    Bin points into ~tile_km squares and score each by summed type weights.
+
+    If `expected` is given (tile id -> baseline count for the window), each
+    tile also gets "expected", "anomaly_ratio" and "anomaly_z", and
+    rank_by="anomaly" orders tiles by z-score instead of raw score.
+    """
     if not points:
         return {"tiles": [], "max_score": 1}
 
-    lats = [p["lat"] for p in points if isinstance(p.get("lat"), (int, float))]
-    lat0 = (sum(lats) / len(lats)) if lats else 38.627
+    if lat0 is None:
+        lats = [p["lat"] for p in points if isinstance(p.get("lat"), (int, float))]
+        lat0 = (sum(lats) / len(lats)) if lats else REF_LAT
 
     bins: Dict[Tuple[int, int], Dict[str, Any]] = {}
     for p in points:
@@ -130,6 +148,7 @@ def score_tiles(points: List[Dict[str, Any]], tile_km: float = 0.45, max_tiles:
         if not b:
             bins[(gx, gy)] = {
                 "score": 0.0,
+                "count": 0,
                 "type_counts": {},
                 "sample_lat": lat,
                 "sample_lng": lng,
@@ -139,6 +158,7 @@ def score_tiles(points: List[Dict[str, Any]], tile_km: float = 0.45, max_tiles:
         t = str(p.get("type") or p.get("call_type") or p.get("category") or "Unknown")
         w = weight_for_type(t)
         b["score"] += w
+        b["count"] += 1
         b["type_counts"][t] = b["type_counts"].get(t, 0) + 1
 
     tiles: List[Dict[str, Any]] = []
@@ -152,22 +172,33 @@ def score_tiles(points: List[Dict[str, Any]], tile_km: float = 0.45, max_tiles:
         top_type = "—"
         if b["type_counts"]:
             top_type = sorted(b["type_counts"].items(), key=lambda x: x[1], reverse=True)[0][0]
-
-        tiles.append(
-            {
-                "id": f"{gx}_{gy}",
-                "score": s,
-                "top_type": top_type,
-                "bounds": [[min_lat, min_lng], [max_lat, max_lng]],
-                "center": [float(b["sample_lat"]), float(b["sample_lng"])],
-            }
-        )
-
-    tiles.sort(key=lambda x: x["score"], reverse=True)
+        top_category = category_name(classify(top_type)[0]) if b["type_counts"] else "other"
+
+        tile = {
+            "id": f"{gx}_{gy}",
+            "score": s,
+            "count": b["count"],
+            "top_type": top_type,
+            "top_category": top_category,
+            "bounds": [[min_lat, min_lng], [max_lat, max_lng]],
+            "center": [float(b["sample_lat"]), float(b["sample_lng"])],
+        }
+        if expected is not None:
+            exp = float(expected((gx, gy)))
+            ratio, z = anomaly(b["count"], exp)
+            tile["expected"] = round(exp, 3)
+            tile["anomaly_ratio"] = round(ratio, 3)
+            tile["anomaly_z"] = round(z, 3)
+        tiles.append(tile)
+
+    if rank_by == "anomaly" and expected is not None:
+        tiles.sort(key=lambda x: (x["anomaly_z"], x["score"]), reverse=True)
+    else:
+        tiles.sort(key=lambda x: x["score"], reverse=True)
     return {"tiles": tiles[:max_tiles], "max_score": max_score}
 
 
-async def llm_narrative(prompt: str) -> str:
+async def llm_narrative(prompt: str, client: Optional["httpx.AsyncClient"] = None) -> str:
     global LLM_LAST_ERROR
     LLM_LAST_ERROR = ""
 
@@ -197,13 +228,16 @@ async def llm_narrative(prompt: str) -> str:
     }
 
     try:
-        async with httpx.AsyncClient(timeout=20.0) as client:
+        if client is None:
+            async with httpx.AsyncClient(timeout=20.0) as own_client:
+                r = await own_client.post(api_url, headers=headers, json=payload)
+        else:
             r = await client.post(api_url, headers=headers, json=payload)
-            if r.status_code == 401:
-                LLM_LAST_ERROR = "unauthorized_401"
-                return ""
-            r.raise_for_status()
-            j = r.json()
+        if r.status_code == 401:
+            LLM_LAST_ERROR = "unauthorized_401"
+            return ""
+        r.raise_for_status()
+        j = r.json()
 
         return (j.get("choices", [{}])[0].get("message", {}).get("content") or "").strip()
     except Exception as e:
@@ -217,6 +251,9 @@ def template_narrative(region: str, hours: int, tiles: List[Dict[str, Any]]) ->
     top = tiles[:3]
     lines = [f"Awareness only (unverified). In {region}, the most active zones in the last {hours}h are:"]
     for i, t in enumerate(top, 1):
-        lines.append(f"- Zone {i}: score {t['score']:.1f}, top type: {t['top_type']}")
+        line = f"- Zone {i}: score {t['score']:.1f}, top type: {t['top_type']}"
+        if "anomaly_ratio" in t:
+            line += f", {t['anomaly_ratio']:.1f}x the usual level for this time of week"
+        lines.append(line)
     lines.append("Consider avoiding the highest-score zone and prefer well-lit main routes.")
     return "\n".join(lines)
\ No newline at end of file
@@ -1,20 +1,36 @@
-from fastapi import FastAPI
+from __future__ import annotations
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-import pandas as pd
-import requests
-from bs4 import BeautifulSoup
+from fastapi.responses import JSONResponse, StreamingResponse
 from datetime import datetime, timezone
 import os
 import glob
 import re
+import asyncio
+import threading
 from datetime import timedelta
+from functools import partial
+from typing import List
 from app.risk_lens import LLM_LAST_ERROR 
 
 
 from fastapi import Query
-
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, Field
+
+from app import live_store
+from app.lazy import lazy_import, preload
+from app.live_stream import sse_events
+from app.areas import area_summary, build_area_index, index_points, points_in_area, resolve_area
+from app.artifacts import load_artifact
+from app.classify import category_name, classify_series, rule_table
+from app.baseline import add_month, baseline_info, expected_count, hour_of_week, new_baseline
+from app.incidents import encode_incident_nums, index_month, keep_mask, new_incident_index
 from app.risk_lens import (
+    REF_LAT,
     bbox_from_points,
+    httpx,
     in_bbox,
     llm_narrative,
     parse_region_from_query,
@@ -23,6 +39,11 @@ from app.risk_lens import (
     template_narrative,
 )
 
+# Heavy deps load on first use so the server can bind right away
+pd = lazy_import("pandas")
+requests = lazy_import("requests")
+bs4 = lazy_import("bs4")
+
 app = FastAPI()
 
 # CORS so frontend can call backend
@@ -144,11 +165,52 @@ def resolve_month_path(month: str):
 
     return None
 
+def month_key_for_path(path: str) -> str:
+    base = file_base_no_ext(path)
+    return to_month_key_from_basename(base) or base
+
+def months_in_order():
+    """Month files as (month_key, path), oldest first."""
+    return sorted((month_key_for_path(p), p) for p in list_month_files())
+
+
+# --- Month ingestion cache ---
+# Each file is read once (re-read only if its mtime changes) and its incident
+# numbers are folded into the cross-month de-duplication index.
+month_frames = {}
+incident_index = new_incident_index()
+month_lock = threading.Lock()
+
+def month_frame(path: str):
+    sig = os.path.getmtime(path)
+    with month_lock:
+        cached = month_frames.get(path)
+        if cached is not None and cached["signature"] == sig:
+            return cached["df"]
+
+        df = pd.read_csv(path)
+        month_key = month_key_for_path(path)
+        inc_col = next((c for c in df.columns if c.lower() == "incidentnum"), None)
+        if inc_col:
+            index_month(incident_index, month_key, encode_incident_nums(df[inc_col]), signature=sig)
+        month_frames[path] = {"signature": sig, "df": df}
+        return df
+
+def month_frame_deduped(path: str):
+    """Rows of a month that aren't superseded by the same incident in a newer month."""
+    df = month_frame(path)
+    month_key = month_key_for_path(path)
+    with month_lock:
+        if month_key not in incident_index["months"]:
+            return df
+        mask = keep_mask(incident_index, month_key)
+    return df.loc[mask]
+
 def load_month_df(month: str):
     path = resolve_month_path(month)
     if not path or not os.path.exists(path):
         return None, None
-    return pd.read_csv(path), file_base_no_ext(path)
+    return month_frame(path), file_base_no_ext(path)
 
 
 # --- Column picking + filters ---
@@ -190,6 +252,35 @@ def filter_last_days(df: pd.DataFrame, days: int):
 def grid_cell(lat: float, lng: float, precision: int = 3):
     return round(lat, precision), round(lng, precision)
 
+def heat_cells(df: pd.DataFrame, lat_col: str, lng_col: str):
+    """
+    Count rows per grid cell, plus a severity-weighted count using the shared
+    offense classification (weights are looked up once per distinct offense).
+    """
+    type_col = pick_type_col(df)
+    if type_col:
+        _, weights = classify_series(df[type_col], rule_table("historical"))
+    else:
+        weights = [1.0] * len(df)
+
+    counts = {}
+    weighted = {}
+    for lat, lng, w in zip(df[lat_col].astype(float), df[lng_col].astype(float), weights):
+        clat, clng = grid_cell(lat, lng)
+        key = f"{clat}_{clng}"
+        counts[key] = counts.get(key, 0) + 1
+        weighted[key] = weighted.get(key, 0.0) + float(w)
+
+    return [
+        {
+            "cell_id": k,
+            "center": [float(k.split("_")[0]), float(k.split("_")[1])],
+            "count": v,
+            "weighted": round(weighted[k], 3),
+        }
+        for k, v in counts.items()
+    ]
+
 
 # --- Live calls scraping ---
 def fetch_live_calls():
@@ -224,7 +315,7 @@ def fetch_live_calls():
 
     # 2) Fallback: BeautifulSoup parse
     if not calls:
-        soup = BeautifulSoup(html, "html.parser")
+        soup = bs4.BeautifulSoup(html, "html.parser")
         table = soup.find("table")
         if table:
             rows = table.find_all("tr")
@@ -242,6 +333,22 @@ def fetch_live_calls():
     cache["live_calls"] = calls[:500]
     cache["live_last_updated"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
 
+    # Keep every scraped call in the local log so windows survive restarts
+    rows = []
+    for c in cache["live_calls"]:
+        dt = parse_live_dt(c.get("time"))
+        rows.append((c, None if pd.isna(dt) else dt.strftime("%Y-%m-%d %H:%M:%S")))
+    live_store.append_calls(rows)
+
+def load_live_log():
+    """
+    Seed the in-memory cache from the local live-call log (used at startup,
+    before the first scrape finishes).
+    """
+    rows = live_store.latest_calls(limit=500)
+    cache["live_calls"] = [{k: r[k] for k in live_store.CALL_FIELDS} for r in rows]
+    cache["live_last_updated"] = live_store.last_updated()
+
 def parse_live_dt(time_str: str):
     """
     Best-effort parse for SLMPD live 'time' strings.
@@ -270,27 +377,163 @@ def parse_live_dt(time_str: str):
     # last resort: let pandas infer
     return pd.to_datetime(s, errors="coerce")
 
-def live_df_filtered(since_hours: int):
-    fetch_live_calls()
-    df = pd.DataFrame(cache.get("live_calls", []))
-    if df.empty or "time" not in df.columns:
-        return df
-
-    df["dt"] = df["time"].apply(parse_live_dt)
-    df = df.dropna(subset=["dt"])
+def live_df_filtered(since_hours: int, refresh: bool = True):
+    if refresh:
+        fetch_live_calls()
+    # Window comes from the local log (indexed range scan), so it can reach
+    # back past the single page the feed currently shows.
+    df = pd.DataFrame(live_store.window_calls(since_hours))
     if df.empty:
         return df
 
-    max_dt = df["dt"].max()
-    cutoff = max_dt - pd.Timedelta(hours=int(since_hours))
-    return df[df["dt"] >= cutoff].copy()
+    df["dt"] = pd.to_datetime(df["dt"], format="%Y-%m-%d %H:%M:%S", errors="coerce")
+    return df.dropna(subset=["dt"])
+
+def live_window_end(items):
+    """
+    End of the live window as a naive local timestamp: the newest parsable
+    item time, or "now" in St. Louis if none parse.
+    """
+    dts = [parse_live_dt(p.get("time")) for p in items]
+    dts = [d for d in dts if not pd.isna(d)]
+    if dts:
+        return max(dts)
+    return pd.Timestamp.now(tz="America/Chicago").tz_localize(None)
+
+
+# --- Historical baseline (expected counts per tile x hour-of-week) ---
+# Tile sizes are snapped to this fixed set, so at most one baseline per entry
+# is ever built and kept (each holds a prefix-sum array per historical tile).
+BASELINE_TILE_SIZES = (0.2, 0.3, 0.45, 0.6, 0.8, 1.0, 1.5, 2.0)
+baselines = {}
+baseline_lock = threading.Lock()
+
+def snap_tile_km(tile_km: float) -> float:
+    return min(BASELINE_TILE_SIZES, key=lambda s: abs(s - float(tile_km)))
+
+def get_baseline(tile_km: float):
+    """
+    Returns the baseline table for this tile size (snapped to
+    BASELINE_TILE_SIZES), folding in any month file that is new or changed
+    since the last call. Unchanged months are skipped.
+    """
+    key = snap_tile_km(tile_km)
+    with baseline_lock:
+        table = baselines.get(key)
+        if table is None:
+            table = new_baseline(key, lat0=REF_LAT)
+            baselines[key] = table
+
+        for month_key, path in months_in_order():
+            sig = os.path.getmtime(path)
+            prev = table["months"].get(month_key)
+            if prev is not None and prev["signature"] == sig:
+                continue
+            add_month(table, month_key, month_frame(path), signature=sig)
+        return table
+
+def score_with_baseline(items, since_hours: int, tile_km: float, max_tiles: int, rank_by: str = "score"):
+    # Live tiles must use the same grid as the baseline they're compared to
+    tile_km = snap_tile_km(tile_km)
+    table = get_baseline(tile_km)
+    end = live_window_end(items)
+    expected = partial(expected_count, table, hour_of_week(end), int(since_hours))
+    scored = score_tiles(items, tile_km=tile_km, max_tiles=max_tiles, lat0=REF_LAT, expected=expected, rank_by=rank_by)
+    scored["tile_km"] = tile_km
+    scored["baseline"] = baseline_info(table)
+    return scored
+
+# --- Named areas (neighborhoods / districts from the monthly CSVs) ---
+area_state = {"signature": None, "index": None}
+area_lock = threading.Lock()
+
+def get_area_index():
+    """Area name lookup + per-area tile sets, rebuilt only when a month file changes."""
+    ordered = months_in_order()
+    sig = tuple((k, os.path.getmtime(p)) for k, p in ordered)
+    with area_lock:
+        if area_state["signature"] != sig:
+            area_state["index"] = build_area_index(month_frame(p) for _, p in ordered)
+            area_state["signature"] = sig
+        return area_state["index"]
+
+# --- Startup warmup + readiness ---
+readiness = {
+    "ready": False,
+    "started_at": None,
+    "ready_at": None,
+    "history_ready": False,
+    "live_seeded": False,
+    "live_scraped": False,
+    "live_error": None,
+    "months_error": None,
+}
+readiness_lock = threading.Lock()
+
+def mark_ready_if_warm():
+    # Ready once historical caches are built and live data is seeded from the
+    # local log; the first scrape is not required (slmpd.org may be slow/down).
+    # If the historical warmup failed, /ready stays 503 with months_error set.
+    with readiness_lock:
+        if not readiness["ready"] and readiness["history_ready"] and readiness["live_seeded"]:
+            readiness["ready"] = True
+            readiness["ready_at"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+
+def warm_history():
+    """Background thread: import pandas/numpy, ingest month files, build the default baseline and area index."""
+    try:
+        preload(["pandas", "numpy"])
+        for _, path in months_in_order():
+            month_frame(path)
+        get_baseline(0.45)
+        get_area_index()
+    except Exception as e:
+        readiness["months_error"] = f"{type(e).__name__}: {e}"
+        return
+    readiness["history_ready"] = True
+    mark_ready_if_warm()
+
+def warm_live():
+    """Background thread: seed live data from the local log, then try one scrape."""
+    try:
+        load_live_log()
+    except Exception as e:
+        readiness["live_error"] = f"{type(e).__name__}: {e}"
+    readiness["live_seeded"] = True
+    mark_ready_if_warm()
+
+    try:
+        preload(["pandas", "requests", "bs4"])
+        fetch_live_calls()
+        readiness["live_scraped"] = True
+        readiness["live_error"] = None
+    except Exception as e:
+        readiness["live_error"] = f"{type(e).__name__}: {e}"
 
 @app.on_event("startup")
 def startup():
-    fetch_live_calls()
+    readiness["started_at"] = datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")
+    threading.Thread(target=warm_history, name="archalert-warm-history", daemon=True).start()
+    threading.Thread(target=warm_live, name="archalert-warm-live", daemon=True).start()
 
 
 # --- API ---
+@app.get("/health")
+def health():
+    # Liveness only: the process is up and serving
+    return {"status": "ok"}
+
+
+@app.get("/ready")
+def ready():
+    body = {
+        **readiness,
+        "live_last_updated": cache.get("live_last_updated"),
+        "months_loaded": len(month_frames),
+    }
+    return JSONResponse(body, status_code=200 if readiness["ready"] else 503)
+
+
 @app.get("/meta")
 def meta():
     am = available_months()
@@ -304,8 +547,7 @@ def meta():
     }
 
 
-@app.get("/monthly-heat")
-def monthly_heat(month: str = "January2026", last_days: int | None = None):
+def compute_monthly_heat(month: str = "January2026", last_days: int | None = None):
     df, loaded_name = load_month_df(month)
     if df is None:
         return {
@@ -331,29 +573,25 @@ def monthly_heat(month: str = "January2026", last_days: int | None = None):
     lat_col, lng_col = possible_lat[0], possible_lng[0]
     df = df.dropna(subset=[lat_col, lng_col])
 
-    counts = {}
-    for lat, lng in zip(df[lat_col].astype(float), df[lng_col].astype(float)):
-        clat, clng = grid_cell(lat, lng)
-        key = f"{clat}_{clng}"
-        counts[key] = counts.get(key, 0) + 1
-
-    cells = [
-        {"cell_id": k, "center": [float(k.split("_")[0]), float(k.split("_")[1])], "count": v}
-        for k, v in counts.items()
-    ]
+    cells = heat_cells(df, lat_col, lng_col)
     return {"month": month, "loaded_file": loaded_name, "last_days": last_days, "cells": cells}
 
 
-@app.get("/historical-heat")
-def historical_heat(months: int = 5, last_days: int | None = None):
-    files = list_month_files()
+def compute_historical_heat(months: int = 5, last_days: int | None = None):
+    files = [p for _, p in months_in_order()]
     if not files:
         return {"months": months, "cells": [], "used_files": [], "available": available_months()}
 
+    # Ingest every month so supplements in newer files are known, then keep
+    # each incident only from the newest file that has it.
+    for p in files:
+        month_frame(p)
+
     take = files[-int(months):] if int(months) > 0 else files
-    dfs = [pd.read_csv(p) for p in take]
+    dfs = [month_frame_deduped(p) for p in take]
     df_all = pd.concat(dfs, ignore_index=True)
     used_files = [file_base_no_ext(p) for p in take]
+    duplicates_dropped = int(sum(len(month_frame(p)) for p in take) - len(df_all))
 
     if last_days is not None:
         df_all, _ = filter_last_days(df_all, int(last_days))
@@ -372,21 +610,17 @@ def historical_heat(months: int = 5, last_days: int | None = None):
     lat_col, lng_col = possible_lat[0], possible_lng[0]
     df_all = df_all.dropna(subset=[lat_col, lng_col])
 
-    counts = {}
-    for lat, lng in zip(df_all[lat_col].astype(float), df_all[lng_col].astype(float)):
-        clat, clng = grid_cell(lat, lng)
-        key = f"{clat}_{clng}"
-        counts[key] = counts.get(key, 0) + 1
-
-    cells = [
-        {"cell_id": k, "center": [float(k.split("_")[0]), float(k.split("_")[1])], "count": v}
-        for k, v in counts.items()
-    ]
-    return {"months": months, "last_days": last_days, "used_files": used_files, "cells": cells}
+    cells = heat_cells(df_all, lat_col, lng_col)
+    return {
+        "months": months,
+        "last_days": last_days,
+        "used_files": used_files,
+        "duplicates_dropped": duplicates_dropped,
+        "cells": cells,
+    }
 
 
-@app.get("/monthly-stats")
-def monthly_stats(month: str = "January2026", last_days: int | None = None):
+def compute_monthly_stats(month: str = "January2026", last_days: int | None = None):
     df, loaded_name = load_month_df(month)
     if df is None:
         return {
@@ -419,10 +653,20 @@ def monthly_stats(month: str = "January2026", last_days: int | None = None):
         hour_series = [{"hour": int(h), "count": int(c)} for h, c in hour_counts.items()]
 
     type_series = []
+    category_series = []
     if type_col:
         top_types = df[type_col].fillna("UNKNOWN").astype(str).value_counts().head(10)
         type_series = [{"type": str(t), "count": int(c)} for t, c in top_types.items()]
 
+        offense_rules = rule_table("historical")
+        codes, weights = classify_series(df[type_col], offense_rules)
+        by_cat = pd.DataFrame({"code": codes, "weight": weights}).groupby("code")["weight"].agg(["size", "sum"])
+        by_cat = by_cat.sort_values("size", ascending=False)
+        category_series = [
+            {"category": category_name(int(code), offense_rules), "count": int(r["size"]), "weighted": round(float(r["sum"]), 3)}
+            for code, r in by_cat.iterrows()
+        ]
+
     return {
         "month": month,
         "loaded_file": loaded_name,
@@ -430,12 +674,133 @@ def monthly_stats(month: str = "January2026", last_days: int | None = None):
         "total_rows": int(len(df)),
         "hour_series": hour_series,
         "type_series": type_series,
+        "category_series": category_series,
         "columns": list(df.columns),
         "used_time_col": time_col,
         "used_type_col": type_col,
     }
 
 
+def compute_area_stats(month: str = "January2026", top_n: int | None = None):
+    df, loaded_name = load_month_df(month)
+    if df is None:
+        return {
+            "month": month,
+            "districts": [],
+            "neighborhoods": [],
+            "available": available_months(),
+            "error": "month file not found",
+        }
+
+    def counts_for(col_name):
+        col = next((c for c in df.columns if c.lower() == col_name), None)
+        if not col:
+            return []
+        vc = df[col].fillna("UNKNOWN").astype(str).str.strip().value_counts()
+        if top_n is not None:
+            vc = vc.head(int(top_n))
+        return [{"name": str(k), "count": int(v)} for k, v in vc.items()]
+
+    return {
+        "month": month,
+        "loaded_file": loaded_name,
+        "total_rows": int(len(df)),
+        "districts": counts_for("district"),
+        "neighborhoods": counts_for("neighborhood"),
+    }
+
+
+# --- Precomputed historical artifacts (see precompute.py) ---
+def month_artifact_key(month: str):
+    path = resolve_month_path(month)
+    return month_key_for_path(path) if path else None
+
+def serve_artifact(kind: str, key):
+    if key is None:
+        return None
+    return load_artifact(kind, str(key), list_month_files())
+
+def standard_artifacts():
+    """
+    Every (kind, key) -> response body that precompute.py writes: each month's
+    heat, stats and area counts, and historical heat for every month count,
+    all without a last_days filter.
+    """
+    out = {}
+    ordered = months_in_order()
+    for month_key, path in ordered:
+        name = file_base_no_ext(path)
+        out[("monthly-heat", month_key)] = compute_monthly_heat(name)
+        out[("monthly-stats", month_key)] = compute_monthly_stats(name)
+        out[("area-stats", month_key)] = compute_area_stats(name)
+    for n in range(0, len(ordered) + 1):
+        out[("historical-heat", str(n))] = compute_historical_heat(n)
+    return out
+
+
+@app.get("/monthly-heat")
+def monthly_heat(month: str = "January2026", last_days: int | None = None):
+    if last_days is None:
+        hit = serve_artifact("monthly-heat", month_artifact_key(month))
+        if hit is not None:
+            return {**hit, "month": month}
+    return compute_monthly_heat(month, last_days)
+
+
+@app.get("/historical-heat")
+def historical_heat(months: int = 5, last_days: int | None = None):
+    if last_days is None:
+        hit = serve_artifact("historical-heat", int(months))
+        if hit is not None:
+            return hit
+    return compute_historical_heat(months, last_days)
+
+
+@app.get("/monthly-stats")
+def monthly_stats(month: str = "January2026", last_days: int | None = None):
+    if last_days is None:
+        hit = serve_artifact("monthly-stats", month_artifact_key(month))
+        if hit is not None:
+            return {**hit, "month": month}
+    return compute_monthly_stats(month, last_days)
+
+
+@app.get("/area-stats")
+def area_stats(month: str = "January2026", top_n: int | None = None):
+    hit = serve_artifact("area-stats", month_artifact_key(month))
+    if hit is not None:
+        out = {**hit, "month": month}
+        if top_n is not None:
+            out["districts"] = out["districts"][: int(top_n)]
+            out["neighborhoods"] = out["neighborhoods"][: int(top_n)]
+        return out
+    return compute_area_stats(month, top_n)
+
+
+# --- Live panels (shared by the single-panel endpoints and /dashboard) ---
+def live_type_counts(df):
+    if df.empty or "type" not in df.columns:
+        return None
+    return df["type"].fillna("UNKNOWN").astype(str).value_counts()
+
+def live_hourly_series(df):
+    g = df["dt"].dt.floor("h").value_counts().sort_index()
+    return [{"hour": t.isoformat(), "count": int(c)} for t, c in g.items()]
+
+def live_alert_items(df, limit: int = 50):
+    # Items (latest first)
+    return df.sort_values("dt", ascending=False)[["time", "type", "location"]].head(limit).to_dict("records")
+
+def alert_summary(since_hours: int, top) -> str:
+    top_label = top[0][0] if top else "—"
+    return f"Last {since_hours}h: dominated by {top_label}. Live calls are unverified; awareness only."
+
+
+@app.get("/areas")
+def areas():
+    return {"areas": area_summary(get_area_index())}
+
+
 @app.get("/live-calls")
 def live_calls():
     fetch_live_calls()
@@ -451,7 +816,7 @@ def live_summary(since_hours: int = 6, top_n: int = 10):
     if "type" not in df.columns:
         return {"since_hours": since_hours, "last_updated": cache.get("live_last_updated"), "top_types": [], "total": int(len(df))}
 
-    vc = df["type"].fillna("UNKNOWN").astype(str).value_counts().head(int(top_n))
+    vc = live_type_counts(df).head(int(top_n))
     top = [[str(k), int(v)] for k, v in vc.items()]
     return {"since_hours": since_hours, "last_updated": cache.get("live_last_updated"), "top_types": top, "total": int(len(df))}
 
@@ -469,14 +834,10 @@ def alerts(since_hours: int = 6):
             "items": [],
         }
 
-    by_type = df["type"].fillna("UNKNOWN").astype(str).value_counts().head(5)
+    by_type = live_type_counts(df).head(5)
     top = [[str(k), int(v)] for k, v in by_type.items()]
-    top_label = top[0][0] if top else "—"
-
-    summary = f"Last {since_hours}h: dominated by {top_label}. Live calls are unverified; awareness only."
-
-    # Items (latest first)
-    out_items = df.sort_values("dt", ascending=False)[["time", "type", "location"]].head(50).to_dict("records")
+    summary = alert_summary(since_hours, top)
+    out_items = live_alert_items(df)
 
     return {
         "since_hours": since_hours,
@@ -490,28 +851,11 @@ def alerts(since_hours: int = 6):
 @app.get("/live-hourly")
 def live_hourly(since_hours: int = 24):
     try:
-        fetch_live_calls()
-
-        df = pd.DataFrame(cache.get("live_calls", []))
+        df = live_df_filtered(since_hours)
         if df.empty:
-            return {"since_hours": since_hours, "hourly": [], "error": "no live calls (live_calls empty)"}
-
-        if "time" not in df.columns:
-            return {"since_hours": since_hours, "hourly": [], "error": f"missing 'time' column. columns={list(df.columns)}"}
+            return {"since_hours": since_hours, "hourly": [], "error": "no live calls with a parsable time"}
 
-        df["dt"] = df["time"].apply(parse_live_dt)
-        df = df.dropna(subset=["dt"])
-        if df.empty:
-            return {"since_hours": since_hours, "hourly": [], "error": "time parse failed (all dt are NaT)"}
-
-        max_dt = df["dt"].max()
-        cutoff = max_dt - pd.Timedelta(hours=int(since_hours))
-        df = df[df["dt"] >= cutoff]
-
-        df["hour_bucket"] = df["dt"].dt.floor("h")
-        g = df.groupby("hour_bucket").size().sort_index()
-
-        hourly = [{"hour": t.isoformat(), "count": int(c)} for t, c in g.items()]
+        hourly = live_hourly_series(df)
         return {"since_hours": since_hours, "last_updated": cache.get("live_last_updated"), "hourly": hourly}
 
     except Exception as e:
@@ -519,32 +863,23 @@ def live_hourly(since_hours: int = 24):
 
 @app.get("/live-types")
 def live_types(since_hours: int = 24, top_n: int = 10):
-    fetch_live_calls()
-
-    df = pd.DataFrame(cache["live_calls"])
-    if df.empty or "time" not in df.columns:
-        return {"since_hours": since_hours, "top_types": [], "error": "no live calls"}
-
-    df["dt"] = df["time"].apply(parse_live_dt)
-    df = df.dropna(subset=["dt"])
+    df = live_df_filtered(since_hours)
     if df.empty:
-        return {"since_hours": since_hours, "top_types": [], "error": "time parse failed"}
-
-    max_dt = df["dt"].max()
-    cutoff = max_dt - pd.Timedelta(hours=since_hours)
-    df = df[df["dt"] >= cutoff]
+        return {"since_hours": since_hours, "top_types": [], "error": "no live calls"}
 
     if "type" not in df.columns:
         return {"since_hours": since_hours, "top_types": [], "error": "no type column"}
 
-    vc = df["type"].fillna("UNKNOWN").astype(str).value_counts().head(int(top_n))
+    vc = live_type_counts(df).head(int(top_n))
     top_types = [{"type": str(k), "count": int(v)} for k, v in vc.items()]
 
     return {"since_hours": since_hours, "last_updated": cache["live_last_updated"], "top_types": top_types}
 
 @app.get("/live-geo")
 def live_geo(since_hours: int = 6, limit: int = 500):
-    df = live_df_filtered(since_hours)
+    return live_geo_from_df(live_df_filtered(since_hours), since_hours, limit)
+
+def live_geo_from_df(df, since_hours: int, limit: int = 500):
     if df.empty:
         return {"since_hours": since_hours, "last_updated": cache.get("live_last_updated"), "items": []}
 
@@ -601,60 +936,228 @@ def live_geo(since_hours: int = 6, limit: int = 500):
 
     return {"since_hours": since_hours, "last_updated": cache.get("live_last_updated"), "items": items}
 
+def live_stream_fetch():
+    fetch_live_calls()
+    return list(cache.get("live_calls", []))
+
+@app.get("/live-stream")
+async def live_stream(request: Request):
+    """
+    Server-Sent Events: a "snapshot" event on connect (when one exists), then
+    "update" events with only new/changed calls and fresh summary counters.
+    All clients share one upstream scrape per LIVE_REFRESH_SECONDS.
+    """
+    return StreamingResponse(
+        sse_events(live_stream_fetch, request.is_disconnected),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+DASHBOARD_FIELDS = ["totals", "top_types", "hourly", "alerts", "heat"]
+
+@app.get("/dashboard")
+def dashboard(
+    since_hours: int = Query(6, ge=1, le=72),
+    top_n: int = Query(10, ge=1, le=50),
+    fields: str = "totals,top_types,hourly,alerts",
+    tile_km: float = Query(0.45, ge=0.2, le=2.0),
+):
+    """
+    All live dashboard panels from one scrape and one window:
+      totals    -> total, summary                (as /alerts)
+      top_types -> [{"type", "count"}]           (as /live-types)
+      hourly    -> [{"hour", "count"}]           (as /live-hourly)
+      alerts    -> latest items                  (as /alerts)
+      heat      -> scored live tiles             (as /risk-tiles)
+    `fields` is a comma-separated subset; only those panels are computed.
+    """
+    wanted = [f.strip() for f in fields.split(",") if f.strip()]
+    unknown = [f for f in wanted if f not in DASHBOARD_FIELDS]
+    if unknown:
+        return {"since_hours": since_hours, "error": f"unknown fields: {unknown}", "available_fields": DASHBOARD_FIELDS}
+
+    df = live_df_filtered(since_hours)
+    out = {"since_hours": since_hours, "last_updated": cache.get("live_last_updated"), "fields": wanted}
+
+    vc = live_type_counts(df)
+    top = [] if vc is None else [{"type": str(k), "count": int(v)} for k, v in vc.head(int(top_n)).items()]
+
+    if "totals" in wanted:
+        out["total"] = int(len(df))
+        out["summary"] = (
+            alert_summary(since_hours, [[t["type"], t["count"]] for t in top])
+            if not df.empty
+            else "No live calls available right now (or time parsing failed)."
+        )
+    if "top_types" in wanted:
+        out["top_types"] = top
+    if "hourly" in wanted:
+        out["hourly"] = [] if df.empty else live_hourly_series(df)
+    if "alerts" in wanted:
+        out["alerts"] = [] if df.empty else live_alert_items(df)
+    if "heat" in wanted:
+        items = live_geo_from_df(df, since_hours, limit=500).get("items", [])
+        out["heat"] = score_with_baseline(items, since_hours, tile_km=tile_km, max_tiles=14)
+
+    return out
+
+
 #LLMS
 @app.get("/risk-tiles")
 def risk_tiles(
     since_hours: int = Query(6, ge=1, le=72),
     tile_km: float = Query(0.45, ge=0.2, le=2.0),
+    rank_by: str = Query("score", pattern="^(score|anomaly)$"),
 ):
     live = live_geo(since_hours=since_hours, limit=500)
     items = live.get("items", []) if isinstance(live, dict) else []
-    scored = score_tiles(items, tile_km=tile_km, max_tiles=14)
+    scored = score_with_baseline(items, since_hours, tile_km=tile_km, max_tiles=14, rank_by=rank_by)
     return {"since_hours": since_hours, **scored}
 
-@app.get("/ask-risk")
-async def ask_risk(
-    q: str = Query(..., min_length=2, max_length=200),
-    since_hours: int = Query(6, ge=1, le=72),
-):
-    live = live_geo(since_hours=since_hours, limit=500)
-    items = live.get("items", []) if isinstance(live, dict) else []
-
-    region = parse_region_from_query(q)
-    city_bbox = bbox_from_points(items)
-    region_bbox = split_bbox_region(city_bbox, region)
-
-    filtered = [p for p in items if in_bbox(p, region_bbox)]
-    scored = score_tiles(filtered, tile_km=0.45, max_tiles=10)
-    tiles = scored["tiles"]
+def resolve_risk_query(q: str, since_hours: int, items, rank_by: str = "score", memo=None):
+    """
+    Region + scored tiles for one question. `memo` lets several questions over
+    the same live snapshot share scoring work: city-wide tiles are scored once
+    per window and each region's tiles once per (window, region).
+    """
+    memo = {} if memo is None else memo
+
+    def scored_for(region_key, points):
+        key = (since_hours, region_key, rank_by)
+        if key not in memo:
+            memo[key] = score_with_baseline(points, since_hours, tile_km=0.45, max_tiles=10, rank_by=rank_by)
+        return memo[key]["tiles"]
+
+    # Named neighborhood/district first: an index lookup of the area's tiles
+    area_match = resolve_area(get_area_index(), q)
+    if area_match:
+        area = area_match["area"]
+        region = area["name"]
+        index_key = ("points_by_tile", since_hours)
+        if index_key not in memo:
+            memo[index_key] = index_points(items)
+        tiles = scored_for(area["id"], points_in_area(memo[index_key], area))
+    else:
+        region = parse_region_from_query(q)
+        city_bbox = bbox_from_points(items)
+        region_bbox = split_bbox_region(city_bbox, region)
+
+        if region_bbox == city_bbox:
+            tiles = scored_for("city", items)
+        else:
+            filtered = [p for p in items if in_bbox(p, region_bbox)]
+            tiles = scored_for(region, filtered)
 
     fallback_used = None
 
     # Fallback A: if region has no tiles, try city-wide tiles
     if len(tiles) == 0 and len(items) > 0:
-        scored2 = score_tiles(items, tile_km=0.45, max_tiles=10)
-        tiles = scored2["tiles"]
+        tiles = scored_for("city", items)
         if len(tiles) > 0:
             fallback_used = "city_wide_tiles"
 
-    prompt = (
+    area_info = None
+    if area_match:
+        area_info = {
+            "id": area_match["area"]["id"],
+            "kind": area_match["area"]["kind"],
+            "name": area_match["area"]["name"],
+            "matched": area_match["matched"],
+            "match": area_match["match"],
+        }
+    return region, tiles, fallback_used, area_info
+
+def risk_prompt(q: str, region: str, since_hours: int, tiles) -> str:
+    return (
         f"User query: {q}\n"
         f"Region interpreted: {region}\n"
         f"Window: last {since_hours} hours\n"
-        f"Top zones (each has score and top_type): {tiles}\n\n"
+        f"Top zones (each has score, top_type, and anomaly_ratio/anomaly_z vs. the usual level for this time of week): {tiles}\n\n"
         "Write an answer that sounds like a helpful assistant.\n"
         "Rules: awareness only, no prediction, no invented streets.\n"
     )
 
-    llm_text = await llm_narrative(prompt)
+async def answer_risk_query(q: str, region: str, since_hours: int, tiles, fallback_used, area=None, client=None):
+    llm_text = await llm_narrative(risk_prompt(q, region, since_hours, tiles), client=client)
     llm_used = bool(llm_text and llm_text.strip())
     answer = llm_text.strip() if llm_used else template_narrative(region, since_hours, tiles)
 
     return {
         "q": q,
         "region": region,
+        "area": area,
         "since_hours": since_hours,
         "answer": answer,
         "tiles": tiles,
         "fallback_used": fallback_used,
-    }
\ No newline at end of file
+    }
+
+def prepare_risk_query(q: str, since_hours: int, rank_by: str):
+    live = live_geo(since_hours=since_hours, limit=500)
+    items = live.get("items", []) if isinstance(live, dict) else []
+    return resolve_risk_query(q, since_hours, items, rank_by=rank_by)
+
+@app.get("/ask-risk")
+async def ask_risk(
+    q: str = Query(..., min_length=2, max_length=200),
+    since_hours: int = Query(6, ge=1, le=72),
+    rank_by: str = Query("score", pattern="^(score|anomaly)$"),
+):
+    # Scrape, live log write and scoring block (and may wait on warmup locks),
+    # so they run in the threadpool; only the LLM call stays on the loop.
+    region, tiles, fallback_used, area = await run_in_threadpool(prepare_risk_query, q, since_hours, rank_by)
+    return await answer_risk_query(q, region, since_hours, tiles, fallback_used, area)
+
+
+class AskRiskItem(BaseModel):
+    q: str = Field(..., min_length=2, max_length=200)
+    since_hours: int = Field(6, ge=1, le=72)
+
+class AskRiskBatch(BaseModel):
+    queries: List[AskRiskItem] = Field(..., min_length=1, max_length=100)
+    rank_by: str = Field("score", pattern="^(score|anomaly)$")
+
+LLM_BATCH_CONCURRENCY = int(os.getenv("LLM_BATCH_CONCURRENCY", "8"))
+
+def prepare_risk_batch(queries, rank_by: str):
+    """
+    One scrape for the whole batch, one window per distinct since_hours, and
+    shared tile scoring across questions.
+    """
+    fetch_live_calls()
+    items_by_window = {}
+    for since_hours in sorted({x.since_hours for x in queries}):
+        df = live_df_filtered(since_hours, refresh=False)
+        items_by_window[since_hours] = live_geo_from_df(df, since_hours, limit=500).get("items", [])
+
+    memo = {}
+    return [
+        (x.q, x.since_hours, *resolve_risk_query(x.q, x.since_hours, items_by_window[x.since_hours], rank_by=rank_by, memo=memo))
+        for x in queries
+    ]
+
+@app.post("/ask-risk/batch")
+async def ask_risk_batch(body: AskRiskBatch):
+    resolved = await run_in_threadpool(prepare_risk_batch, body.queries, body.rank_by)
+
+    # LLM calls are fanned out concurrently (bounded) over one HTTP client
+    sem = asyncio.Semaphore(max(1, LLM_BATCH_CONCURRENCY))
+    client = httpx.AsyncClient(timeout=20.0) if httpx is not None else None
+
+    async def one(q, since_hours, region, tiles, fallback_used, area):
+        async with sem:
+            return await answer_risk_query(q, region, since_hours, tiles, fallback_used, area, client=client)
+
+    try:
+        answers = await asyncio.gather(*[one(*r) for r in resolved])
+    finally:
+        if client is not None:
+            await client.aclose()
+
+    return {
+        "last_updated": cache.get("live_last_updated"),
+        "rank_by": body.rank_by,
+        "count": len(answers),
+        "answers": answers,
+    }
@@ -0,0 +1,38 @@
+"""
+Offline build step for historical views.
+
+Reads every CSV in data/monthly, computes the standard /monthly-heat,
+/monthly-stats, /area-stats and /historical-heat responses, and writes them as
+a versioned artifact set (data/artifacts/<version>/). The API serves these
+directly and only computes on the fly for non-standard parameters
+(e.g. last_days) or when the month files no longer match the build.
+
+Usage (from backend/):
+    python precompute.py [--out DIR]
+"""
+import argparse
+import time
+
+from app.artifacts import default_root, describe_inputs, write_artifacts
+from main import list_month_files, standard_artifacts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute static historical artifacts for ArchAlert.")
+    parser.add_argument("--out", default=default_root(), help="artifact root directory (default: %(default)s)")
+    args = parser.parse_args()
+
+    files = list_month_files()
+    if not files:
+        print("No month files found; nothing to build.")
+        return
+
+    t0 = time.time()
+    inputs = describe_inputs(files)
+    payloads = standard_artifacts()
+    version = write_artifacts(inputs, payloads, root=args.out)
+    print(f"Wrote {len(payloads)} artifacts from {len(files)} month files to {args.out}/{version} in {time.time() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    main()